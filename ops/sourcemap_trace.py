@@ -6,7 +6,10 @@ A node-free tool to resolve minified JavaScript stack traces to original source
 using sourcemap files. Designed for use on staging/production hosts that have Python but not Node.
 
 Usage:
-    python3 ops/sourcemap_trace.py <path_to_js.map> <line> <column>
+    python3 ops/sourcemap_trace.py [--no-context] <path_to_js.map> <line> <column>
+
+    --no-context  Skip the "nearby mappings" listing and decode only the generated
+                  lines around the target instead of the whole mappings string.
 
 Example:
     python3 ops/sourcemap_trace.py /tmp/main.abc123.js.map 2 1690087
@@ -14,15 +17,32 @@ Example:
 Requirements:
     - Python 3.6+
     - No external dependencies (uses only stdlib)
+    - Optional: orjson, used for faster sourcemap loading when installed
 
 The script implements VLQ decoding and sourcemap parsing according to the Source Map v3 spec.
+
+Parsed mappings are cached next to the sourcemap (<map>.trace-cache) so repeated
+lookups against the same file skip parsing. The cache is keyed on the sourcemap's
+size and modification time and is ignored if stale or unreadable.
 """
 
 import json
+import mmap
+import re
+import stat
 import sys
 import os
+import tempfile
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional, Tuple, List, NamedTuple
 
+try:
+    import orjson
+except ImportError:  # Optional; the stdlib scanner in load_sourcemap_fields is used instead
+    orjson = None
+
 
 class SourceMapping(NamedTuple):
     """Represents a decoded source mapping."""
@@ -34,27 +54,159 @@ class SourceMapping(NamedTuple):
     name: Optional[str]
 
 
+# Running (source index, original line, original column, name index) values
+# carried from segment to segment while decoding mappings
+MappingState = Tuple[int, int, int, int]
+
+# Stored in Mappings.src_idx / Mappings.name_idx for segments that carry no
+# source (1-field) or no name (4-field) information
+UNMAPPED = -(1 << 31)
+
+
+class Mappings:
+    """Decoded mappings stored as parallel int32 columns (struct-of-arrays).
+
+    Index ``i`` across all columns describes one segment. Source file and name
+    strings are only resolved when a segment is materialized with ``get``.
+
+    Segments are stored in generated (line, column) order, so the segments of
+    generated line ``L`` are ``line_offset[L - first_line]:line_offset[L - first_line + 1]``.
+    ``first_line`` is 0 unless only a window of lines was parsed. A segment's
+    generated line is not stored per segment; ``generated_line`` recovers it
+    from ``line_offset``.
+    """
+
+    __slots__ = ('sources', 'names', 'first_line', 'gen_col', 'src_idx',
+                 'orig_line', 'orig_col', 'name_idx', 'line_offset')
+
+    def __init__(self, sources: List[str], names: List[str], first_line: int = 0):
+        self.sources = sources
+        self.names = names
+        self.first_line = first_line
+        self.gen_col = array('i')
+        self.src_idx = array('i')
+        self.orig_line = array('i')
+        self.orig_col = array('i')
+        self.name_idx = array('i')
+        self.line_offset = array('i', [0])
+
+    def __len__(self) -> int:
+        return len(self.gen_col)
+
+    def line_range(self, line: int) -> Tuple[int, int]:
+        """Return the (start, end) index range of segments on a generated line."""
+        line -= self.first_line
+        if 0 <= line < len(self.line_offset) - 1:
+            return self.line_offset[line], self.line_offset[line + 1]
+        return 0, 0
+
+    def generated_line(self, index: int) -> int:
+        """Return the generated line of the segment at ``index``."""
+        # Empty lines repeat an offset; bisect_right skips past them
+        return self.first_line + bisect_right(self.line_offset, index) - 1
+
+    def lines_with_mappings(self) -> List[int]:
+        """Return the generated lines that have at least one segment."""
+        line_offset = self.line_offset
+        return [
+            self.first_line + l for l in range(len(line_offset) - 1)
+            if line_offset[l] != line_offset[l + 1]
+        ]
+
+    def get(self, index: int) -> SourceMapping:
+        """Materialize the segment at ``index`` as a SourceMapping."""
+        source_file = None
+        orig_line = None
+        orig_col = None
+        name = None
+
+        src_idx = self.src_idx[index]
+        if src_idx != UNMAPPED:
+            if 0 <= src_idx < len(self.sources):
+                source_file = self.sources[src_idx]
+            orig_line = self.orig_line[index]
+            orig_col = self.orig_col[index]
+
+            name_idx = self.name_idx[index]
+            if name_idx != UNMAPPED and 0 <= name_idx < len(self.names):
+                name = self.names[name_idx]
+
+        return SourceMapping(
+            generated_line=self.generated_line(index),
+            generated_column=self.gen_col[index],
+            source_file=source_file,
+            original_line=orig_line,
+            original_column=orig_col,
+            name=name
+        )
+
+
 # Base64 VLQ decoding
 BASE64_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
-BASE64_MAP = {char: i for i, char in enumerate(BASE64_CHARS)}
+# 256-entry lookup table of BASE64_CHARS digit values indexed by byte value;
+# 0xFF marks non-base64 bytes
+_B64_LUT = bytes.fromhex(
+    'ff' * 43 + '3e' + 'ff' * 3 + '3f'  # '+', '/'
+    + '3435363738393a3b3c3d' + 'ff' * 7  # '0'-'9'
+    + '000102030405060708090a0b0c0d0e0f10111213141516171819' + 'ff' * 6  # 'A'-'Z'
+    + '1a1b1c1d1e1f202122232425262728292a2b2c2d2e2f30313233' + 'ff' * 133  # 'a'-'z'
+)
+_B64_INVALID = 0xFF
 
 VLQ_BASE_SHIFT = 5
 VLQ_BASE = 1 << VLQ_BASE_SHIFT  # 32
 VLQ_BASE_MASK = VLQ_BASE - 1  # 31
 VLQ_CONTINUATION_BIT = VLQ_BASE  # 32
 
+# Translation table taking a mappings byte straight to its VLQ digit, with the
+# segment and line separators given codes of their own. parse_mappings
+# translates the whole buffer in one C-level pass instead of doing a table
+# lookup per byte in the interpreter loop.
+_SEGMENT_END = 0x40  # ','
+_LINE_END = 0x41  # ';'
+_VLQ_DIGITS = bytes(
+    _SEGMENT_END if i == 0x2C else _LINE_END if i == 0x3B else _B64_LUT[i]
+    for i in range(256)
+)
+# Signed values of single-digit VLQs, by far the most common in sourcemaps
+_VLQ_SINGLE_DIGIT = tuple(-(d >> 1) if d & 1 else d >> 1 for d in range(VLQ_BASE))
+
+# Sourcemap keys read by this tool; everything else (notably the potentially
+# huge 'sourcesContent' array) is skipped without being decoded
+SOURCEMAP_FIELDS = ('sources', 'names', 'mappings')
 
-def decode_vlq(encoded: str) -> List[int]:
-    """Decode a VLQ-encoded string into a list of integers."""
+# How many lines either side of the target find_mapping falls back to when the
+# target generated line has no mappings
+ADJACENT_LINE_SEARCH = 4
+
+# Below this many bytes of mappings, starting worker processes costs more than
+# parse_mappings_parallel saves
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+
+# On-disk cache of parsed Mappings columns, stored next to the sourcemap
+CACHE_SUFFIX = '.trace-cache'
+CACHE_MAGIC = b'SOURCEMAP-TRACE-CACHE 2\n'
+_CACHE_COLUMNS = ('gen_col', 'src_idx', 'orig_line', 'orig_col', 'name_idx',
+                  'line_offset')
+
+# Byte-level JSON scanning patterns used to walk the top-level object
+_JSON_WS = re.compile(rb'[ \t\n\r]*')
+_JSON_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_JSON_NESTED_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]', re.DOTALL)
+_JSON_SCALAR = re.compile(rb'[^,}\]\s]+')
+
+
+def decode_vlq(encoded: bytes) -> List[int]:
+    """Decode a VLQ-encoded ASCII byte string into a list of integers."""
     result = []
     shift = 0
     value = 0
     
-    for char in encoded:
-        if char not in BASE64_MAP:
+    for byte in encoded:
+        digit = _B64_LUT[byte]
+        if digit == _B64_INVALID:
             continue
         
-        digit = BASE64_MAP[char]
         continuation = digit & VLQ_CONTINUATION_BIT
         digit &= VLQ_BASE_MASK
         value += digit << shift
@@ -63,120 +215,370 @@ def decode_vlq(encoded: str) -> List[int]:
             shift += VLQ_BASE_SHIFT
         else:
             # Convert from VLQ signed representation
-            is_negative = value & 1
-            value = value >> 1
-            if is_negative:
-                value = -value
-            result.append(value)
+            result.append(-(value >> 1) if value & 1 else value >> 1)
             value = 0
             shift = 0
     
     return result
 
 
-def parse_mappings(mappings_str: str, sources: List[str], names: List[str]) -> List[SourceMapping]:
-    """Parse the 'mappings' string from a sourcemap into SourceMapping objects."""
-    result = []
+def _sort_line_by_column(mappings: Mappings, start: int) -> None:
+    """Stable-sort the segments from ``start`` to the end by generated column."""
+    order = sorted(range(start, len(mappings)), key=mappings.gen_col.__getitem__)
+    for column in (mappings.gen_col, mappings.src_idx, mappings.orig_line,
+                   mappings.orig_col, mappings.name_idx):
+        column[start:] = array('i', [column[i] for i in order])
+
+
+def _scan_mappings(buf: bytes, result: Mappings,
+                   state: MappingState = (0, 0, 0, 0)) -> MappingState:
+    """Decode a ';'-terminated run of mappings lines, appending to ``result``.
+
+    The buffer is scanned once, byte by byte: VLQ digits are decoded inline and
+    segments are emitted on ',' and ';' without splitting the buffer into
+    intermediate line/segment strings. ``state`` gives the running values in
+    effect at the start of ``buf``; the state at its end is returned.
+
+    Lookups bisect each line's generated columns, so segments must be in
+    column order within a line. Generators emit them that way (column deltas
+    are non-negative after a line's first segment); a line that breaks this
+    is re-sorted when it ends.
+    """
+    append_gen_col = result.gen_col.append
+    append_src_idx = result.src_idx.append
+    append_orig_line = result.orig_line.append
+    append_orig_col = result.orig_col.append
+    append_name_idx = result.name_idx.append
+    append_line_offset = result.line_offset.append
     
     # State variables (these are relative/cumulative)
-    generated_line = 0
     generated_column = 0
-    source_index = 0
-    original_line = 0
-    original_column = 0
-    name_index = 0
+    source_index, original_line, original_column, name_index = state
+    line_unsorted = False
     
-    # Split by lines (semicolons)
-    lines = mappings_str.split(';')
+    # VLQ decoder state for the segment being scanned. Decoded fields go into a
+    # reused 5-slot buffer; num_fields counts them, including any past the
+    # fifth, which the spec does not define and which are ignored.
+    fields = [0] * 5
+    num_fields = 0
+    shift = 0
+    value = 0
     
-    for line_mappings in lines:
-        generated_column = 0  # Reset column for each new line
-        
-        if line_mappings:
-            # Split by segments (commas)
-            segments = line_mappings.split(',')
-            
-            for segment in segments:
-                if not segment:
-                    continue
-                
-                fields = decode_vlq(segment)
-                
-                if len(fields) >= 1:
-                    generated_column += fields[0]
-                
-                source_file = None
-                orig_line = None
-                orig_col = None
-                name = None
+    single_digit = _VLQ_SINGLE_DIGIT
+    
+    for digit in buf.translate(_VLQ_DIGITS):
+        if digit < VLQ_CONTINUATION_BIT:
+            if shift:
+                # Final digit of a value: convert from VLQ signed representation
+                # (sign-magnitude, low bit is the sign; not zig-zag, so the
+                # '(v >> 1) ^ -(v & 1)' trick does not apply). A conditional
+                # expression beats the branch-free form in CPython.
+                value += digit << shift
+                value = -(value >> 1) if value & 1 else value >> 1
+                shift = 0
+            else:
+                value = single_digit[digit]
+            if num_fields < 5:
+                fields[num_fields] = value
+            num_fields += 1
+            value = 0
+        elif digit < _SEGMENT_END:
+            value += (digit & VLQ_BASE_MASK) << shift
+            shift += VLQ_BASE_SHIFT
+        elif digit != _B64_INVALID:  # ',' ends a segment, ';' also ends a line
+            if num_fields:
+                if fields[0] < 0:
+                    line_unsorted = True
+                generated_column += fields[0]
+                append_gen_col(generated_column)
                 
-                if len(fields) >= 4:
+                if num_fields >= 4:
                     source_index += fields[1]
                     original_line += fields[2]
                     original_column += fields[3]
+                    append_src_idx(source_index)
+                    append_orig_line(original_line)
+                    append_orig_col(original_column)
                     
-                    if 0 <= source_index < len(sources):
-                        source_file = sources[source_index]
-                    orig_line = original_line
-                    orig_col = original_column
-                
-                if len(fields) >= 5:
+                    if num_fields >= 5:
+                        name_index += fields[4]
+                        append_name_idx(name_index)
+                    else:
+                        append_name_idx(UNMAPPED)
+                else:
+                    append_src_idx(UNMAPPED)
+                    append_orig_line(0)
+                    append_orig_col(0)
+                    append_name_idx(UNMAPPED)
+                num_fields = 0
+            
+            # A truncated VLQ value does not carry over into the next segment
+            value = 0
+            shift = 0
+            
+            if digit == _LINE_END:
+                if line_unsorted:
+                    _sort_line_by_column(result, result.line_offset[-1])
+                    line_unsorted = False
+                append_line_offset(len(result.gen_col))
+                generated_column = 0  # Reset column for each new line
+    
+    return source_index, original_line, original_column, name_index
+
+
+def _sum_mapping_deltas(buf: bytes) -> MappingState:
+    """Sum the running-value deltas of a ';'-terminated run of mappings lines.
+
+    Gives the change in state across ``buf`` without building any columns, so
+    the state at the start of a later chunk can be known before parsing it.
+    """
+    source_index = 0
+    original_line = 0
+    original_column = 0
+    name_index = 0
+    
+    fields = [0] * 5
+    num_fields = 0
+    shift = 0
+    value = 0
+    single_digit = _VLQ_SINGLE_DIGIT
+    
+    for digit in buf.translate(_VLQ_DIGITS):
+        if digit < VLQ_CONTINUATION_BIT:
+            if shift:
+                value += digit << shift
+                value = -(value >> 1) if value & 1 else value >> 1
+                shift = 0
+            else:
+                value = single_digit[digit]
+            if num_fields < 5:
+                fields[num_fields] = value
+            num_fields += 1
+            value = 0
+        elif digit < _SEGMENT_END:
+            value += (digit & VLQ_BASE_MASK) << shift
+            shift += VLQ_BASE_SHIFT
+        elif digit != _B64_INVALID:
+            if num_fields >= 4:
+                source_index += fields[1]
+                original_line += fields[2]
+                original_column += fields[3]
+                if num_fields >= 5:
                     name_index += fields[4]
-                    if 0 <= name_index < len(names):
-                        name = names[name_index]
-                
-                result.append(SourceMapping(
-                    generated_line=generated_line,
-                    generated_column=generated_column,
-                    source_file=source_file,
-                    original_line=orig_line,
-                    original_column=orig_col,
-                    name=name
-                ))
-        
-        generated_line += 1
+            num_fields = 0
+            value = 0
+            shift = 0
     
+    return source_index, original_line, original_column, name_index
+
+
+def _parse_mappings_chunk(buf: bytes, state: MappingState) -> Mappings:
+    """Parse one chunk of lines for parse_mappings_parallel (runs in a worker)."""
+    result = Mappings([], [])
+    _scan_mappings(buf, result, state)
     return result
 
 
-def find_mapping(mappings: List[SourceMapping], line: int, column: int) -> Optional[SourceMapping]:
-    """Find the closest mapping for a given generated line and column."""
-    # Filter to mappings on the target line
-    line_mappings = [m for m in mappings if m.generated_line == line]
-    
-    if not line_mappings:
-        # Try adjacent lines
-        for offset in range(1, 5):
-            line_mappings = [m for m in mappings if m.generated_line == line - offset]
-            if line_mappings:
-                print(f"[Note] No mappings on line {line}, using line {line - offset}")
-                break
-            line_mappings = [m for m in mappings if m.generated_line == line + offset]
-            if line_mappings:
-                print(f"[Note] No mappings on line {line}, using line {line + offset}")
-                break
+def parse_mappings(mappings: bytes, sources: List[str], names: List[str]) -> Mappings:
+    """Parse the 'mappings' field from a sourcemap into a Mappings table.
+
+    A ``str`` is accepted too and encoded to ASCII first.
+    """
+    # Mappings are ASCII by spec; work on bytes so the whole buffer can be
+    # translated to VLQ digits at once. The trailing ';' flushes the last segment.
+    if isinstance(mappings, str):
+        mappings = mappings.encode('ascii', errors='ignore')
     
-    if not line_mappings:
+    result = Mappings(sources, names)
+    _scan_mappings(mappings + b';', result)
+    return result
+
+
+def _skip_lines(mappings: bytes, pos: int, count: int) -> Optional[int]:
+    """Return the offset just past the ``count``-th ';' at or after ``pos``.
+
+    A single counted-repetition regex match walks the separators in C, several
+    times faster than a bytes.find() per line, and reads nothing past the
+    separator it stops at. Returns None if fewer than ``count`` are left.
+    """
+    if count <= 0:
+        return pos
+    # Each line needs at least its ';', and a huge count would overflow the regex repeat
+    if count > len(mappings) - pos:
         return None
+    match = re.compile(rb'(?:[^;]*;){%d}' % count).match(mappings, pos)
+    return match.end() if match else None
+
+
+def parse_mappings_line_range(mappings: bytes, sources: List[str], names: List[str],
+                              first_line: int, last_line: int) -> Mappings:
+    """Parse only generated lines ``first_line`` to ``last_line`` (inclusive).
+
+    The window's byte range is found by counting ';' separators at C level.
+    For earlier lines only the running source/original/name deltas are
+    summed, without building any columns. Scanning stops at the end of
+    ``last_line``: later lines are not read at all.
+    """
+    if isinstance(mappings, str):
+        mappings = mappings.encode('ascii', errors='ignore')
+    first_line = max(first_line, 0)
+    result = Mappings(sources, names, first_line)
+    
+    start = _skip_lines(mappings, 0, first_line)
+    if start is None:
+        return result
     
-    # Sort by column
-    line_mappings.sort(key=lambda m: m.generated_column)
+    end = _skip_lines(mappings, start, last_line + 1 - first_line)
+    if end is None:
+        end = len(mappings)
+    window = mappings[start:end]
+    if not window.endswith(b';'):
+        window += b';'
     
+    state = _sum_mapping_deltas(mappings[:start])
+    _scan_mappings(window, result, state)
+    return result
+
+
+def parse_mappings_parallel(mappings: bytes, sources: List[str], names: List[str],
+                            workers: Optional[int] = None) -> Mappings:
+    """Parse the 'mappings' field using a pool of worker processes.
+
+    The buffer is cut into one chunk per worker at ';' boundaries. Generated
+    columns restart on every line, so only the four running values carried
+    across lines depend on earlier chunks: a first round sums each chunk's
+    deltas, their prefix sums give every chunk its starting state, and a
+    second round parses the chunks with that state. Small inputs, single-CPU
+    hosts and hosts where a process pool cannot be started use parse_mappings.
+    """
+    if isinstance(mappings, str):
+        mappings = mappings.encode('ascii', errors='ignore')
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 2 or len(mappings) < PARALLEL_MIN_BYTES:
+        return parse_mappings(mappings, sources, names)
+    
+    # Cut into ';'-terminated chunks
+    chunks = []
+    chunk_size = len(mappings) // workers + 1
+    start = 0
+    while start < len(mappings):
+        end = mappings.find(b';', start + chunk_size)
+        end = len(mappings) if end == -1 else end + 1
+        chunks.append(mappings[start:end])
+        start = end
+    if not chunks or chunks[-1].endswith(b';'):
+        chunks.append(b'')
+    chunks[-1] += b';'
+    
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunk_states = [(0, 0, 0, 0)]
+            for deltas in pool.map(_sum_mapping_deltas, chunks[:-1]):
+                chunk_states.append(tuple(s + d for s, d in zip(chunk_states[-1], deltas)))
+            parts = list(pool.map(_parse_mappings_chunk, chunks, chunk_states))
+    except (OSError, RuntimeError):
+        return parse_mappings(mappings, sources, names)
+    
+    result = Mappings(sources, names)
+    for part in parts:
+        base = len(result)
+        result.line_offset.extend(array('i', [offset + base for offset in part.line_offset[1:]]))
+        for column in ('gen_col', 'src_idx', 'orig_line', 'orig_col', 'name_idx'):
+            getattr(result, column).extend(getattr(part, column))
+    
+    return result
+
+
+def _fallback_lines(line: int):
+    """Yield ``line``, then the lines around it nearest first, earlier line first."""
+    yield line
+    for offset in range(1, ADJACENT_LINE_SEARCH + 1):
+        yield line - offset
+        yield line + offset
+
+
+def _find_in_line(mappings: Mappings, start: int, end: int, column: int) -> int:
+    """Return the index of the best mapping for ``column`` within one line's range.
+
+    Relies on segments being in column order within a line, which
+    parse_mappings guarantees, so no per-lookup sort is needed.
+    """
     # Find the closest mapping at or before the target column
-    best = None
-    for mapping in line_mappings:
-        if mapping.generated_column <= column:
-            best = mapping
-        else:
-            break
+    best = bisect_right(mappings.gen_col, column, start, end) - 1
     
     # If no mapping at or before, use the first one after
-    if best is None and line_mappings:
-        best = line_mappings[0]
+    if best < start:
+        best = start
     
     return best
 
 
+def find_mapping(mappings: Mappings, line: int, column: int) -> Optional[int]:
+    """Find the index of the closest mapping for a given generated line and column."""
+    # Try the line itself, then adjacent lines
+    for candidate in _fallback_lines(line):
+        start, end = mappings.line_range(candidate)
+        if start != end:
+            if candidate != line:
+                print(f"[Note] No mappings on line {line}, using line {candidate}")
+            return _find_in_line(mappings, start, end, column)
+    
+    return None
+
+
+def find_trace_mapping(mappings: Mappings, line: int, column: int) -> Optional[int]:
+    """Find the index of the closest mapping for a stack-trace line and column.
+
+    Stack traces usually report 1-indexed lines while sourcemaps are 0-indexed,
+    so ``line - 1`` and its adjacent lines are tried first, then ``line`` as-is.
+    Every candidate line is checked once, and only the first one with mappings
+    gets a column lookup.
+    """
+    checked = set()
+    for base in (line - 1, line):
+        for candidate in _fallback_lines(base):
+            if candidate in checked:
+                continue
+            checked.add(candidate)
+            
+            start, end = mappings.line_range(candidate)
+            if start != end:
+                if candidate != base:
+                    print(f"[Note] No mappings on line {base}, using line {candidate}")
+                return _find_in_line(mappings, start, end, column)
+    
+    return None
+
+
+def find_nearby_mappings(mappings: Mappings, index: int, radius: int = 5) -> List[int]:
+    """Find mappings near the one at ``index`` in the same original source file.
+
+    Returns the index of the first mapping for each original line within
+    ``radius`` lines of the target, ordered by original line.
+    """
+    sources = mappings.sources
+    target_src_idx = mappings.src_idx[index]
+    if 0 <= target_src_idx < len(sources):
+        # Match on the path, since a sources list may repeat a file at several indices
+        target_source = sources[target_src_idx]
+        same_file = {i for i, source in enumerate(sources) if source == target_source}
+    else:
+        same_file = {target_src_idx}
+    low = mappings.orig_line[index] - radius
+    high = mappings.orig_line[index] + radius
+    orig_line = mappings.orig_line
+    
+    first_by_line = {}
+    for i, src_idx in enumerate(mappings.src_idx):
+        if src_idx in same_file:
+            line = orig_line[i]
+            if low <= line <= high and line not in first_by_line:
+                first_by_line[line] = i
+    
+    return [first_by_line[line] for line in sorted(first_by_line)]
+
+
 def validate_sourcemap(filepath: str) -> Tuple[bool, str]:
     """Validate that a file is a valid sourcemap JSON."""
     if not os.path.exists(filepath):
@@ -195,9 +597,223 @@ def validate_sourcemap(filepath: str) -> Tuple[bool, str]:
     return True, "OK"
 
 
+def _skip_json_value(buf, pos: int) -> int:
+    """Return the offset just past the JSON value starting at ``pos``."""
+    first = buf[pos:pos + 1]
+    
+    if first == b'"':
+        match = _JSON_STRING.match(buf, pos)
+        if match is None:
+            raise ValueError(f"Unterminated string at byte {pos}")
+        return match.end()
+    
+    if first == b'[' or first == b'{':
+        depth = 0
+        for match in _JSON_NESTED_TOKEN.finditer(buf, pos):
+            token = buf[match.start()]
+            if token == 0x22:  # '"': strings are skipped whole
+                continue
+            if token == 0x5B or token == 0x7B:  # '[' or '{'
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return match.end()
+        raise ValueError(f"Unterminated array or object at byte {pos}")
+    
+    match = _JSON_SCALAR.match(buf, pos)
+    if match is None:
+        raise ValueError(f"Expected a value at byte {pos}")
+    return match.end()
+
+
+def load_sourcemap_fields(filepath: str) -> Tuple[List[str], List[str], bytes]:
+    """Read 'sources', 'names' and 'mappings' from a sourcemap file.
+
+    The file is memory-mapped. When orjson is installed it decodes the whole
+    document straight from the mapping, which is faster than skipping unused
+    values in Python. Otherwise the top-level object is walked key by key and
+    only the three fields used by this tool are JSON-decoded. As with json and
+    orjson, the last occurrence of a duplicated key wins. 'mappings' is
+    returned as raw bytes. Raises ValueError on malformed JSON.
+    """
+    spans = {}
+    found = {}
+    
+    with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        if orjson is not None:
+            with memoryview(buf) as view:
+                sourcemap = orjson.loads(view)
+            if not isinstance(sourcemap, dict):
+                raise ValueError("Sourcemap is not a JSON object")
+            mappings = sourcemap.get('mappings', '')
+            if isinstance(mappings, str):
+                mappings = mappings.encode('ascii', errors='ignore')
+            return sourcemap.get('sources', []), sourcemap.get('names', []), mappings
+        
+        pos = _JSON_WS.match(buf, 0).end()
+        if buf[pos:pos + 1] != b'{':
+            raise ValueError("Sourcemap is not a JSON object")
+        pos += 1
+        
+        while True:
+            pos = _JSON_WS.match(buf, pos).end()
+            if buf[pos:pos + 1] == b'}':
+                break
+            
+            match = _JSON_STRING.match(buf, pos)
+            if match is None:
+                raise ValueError(f"Expected property name at byte {pos}")
+            key = json.loads(match.group())
+            
+            pos = _JSON_WS.match(buf, match.end()).end()
+            if buf[pos:pos + 1] != b':':
+                raise ValueError(f"Expected ':' at byte {pos}")
+            pos = _JSON_WS.match(buf, pos + 1).end()
+            
+            end = _skip_json_value(buf, pos)
+            if key in SOURCEMAP_FIELDS:
+                # Decoded after the walk, so only the last duplicate is decoded
+                spans[key] = (pos, end)
+            
+            pos = _JSON_WS.match(buf, end).end()
+            separator = buf[pos:pos + 1]
+            if separator == b',':
+                pos += 1
+            elif separator == b'}':
+                break
+            else:
+                raise ValueError(f"Expected ',' or '}}' at byte {pos}")
+        
+        for key, (start, end) in spans.items():
+            value = buf[start:end]
+            if key == 'mappings' and value[:1] == b'"' and b'\\' not in value:
+                # Plain ASCII by spec: slice it out as-is, no text decoding
+                found[key] = value[1:-1]
+            else:
+                found[key] = json.loads(value)
+                if key == 'mappings' and isinstance(found[key], str):
+                    found[key] = found[key].encode('ascii', errors='ignore')
+    
+    return found.get('sources', []), found.get('names', []), found.get('mappings', b'')
+
+
+def mappings_cache_path(map_path: str) -> str:
+    """Return the path of the parsed-mappings cache for a sourcemap."""
+    return map_path + CACHE_SUFFIX
+
+
+def _cache_key(map_path: str) -> dict:
+    """Describe the sourcemap file and column layout a cache was built from."""
+    map_stat = os.stat(map_path)
+    return {
+        'mtime_ns': map_stat.st_mtime_ns,
+        'size': map_stat.st_size,
+        'byteorder': sys.byteorder,
+        'itemsize': array('i').itemsize,
+    }
+
+
+def _is_trusted_cache_file(f) -> bool:
+    """Check that an open cache file was written by us and only we can modify it.
+
+    Sourcemaps usually sit in shared directories such as /tmp, where another
+    user could plant a cache with a matching key to fake lookup results.
+    """
+    if not hasattr(os, 'getuid'):  # No POSIX ownership to check (Windows)
+        return True
+    cache_stat = os.fstat(f.fileno())
+    return (cache_stat.st_uid == os.getuid()
+            and not cache_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH))
+
+
+def _is_consistent(mappings: Mappings) -> bool:
+    """Check that cached columns line up, so lookups cannot index out of range."""
+    count = len(mappings.gen_col)
+    if any(len(getattr(mappings, column)) != count for column in _CACHE_COLUMNS
+           if column != 'line_offset'):
+        return False
+    if not isinstance(mappings.sources, list) or not isinstance(mappings.names, list):
+        return False
+    
+    line_offset = mappings.line_offset
+    if not line_offset or line_offset[0] != 0 or line_offset[-1] != count:
+        return False
+    return all(line_offset[i] <= line_offset[i + 1] for i in range(len(line_offset) - 1))
+
+
+def load_mappings_cache(map_path: str) -> Optional[Mappings]:
+    """Load cached Mappings for a sourcemap, or None if missing, stale or untrusted."""
+    cache_path = mappings_cache_path(map_path)
+    try:
+        with open(cache_path, 'rb') as f:
+            if not _is_trusted_cache_file(f):
+                return None
+            if f.readline() != CACHE_MAGIC:
+                return None
+            header = json.loads(f.readline())
+            if header.get('key') != _cache_key(map_path):
+                return None
+            
+            mappings = Mappings(header['sources'], header['names'])
+            for column in _CACHE_COLUMNS:
+                values = array('i')
+                values.fromfile(f, header['lengths'][column])
+                setattr(mappings, column, values)
+    except (OSError, EOFError, ValueError, KeyError, TypeError):
+        return None
+    
+    if not _is_consistent(mappings):
+        return None
+    
+    return mappings
+
+
+def save_mappings_cache(mappings: Mappings, map_path: str) -> bool:
+    """Write Mappings to the cache for a sourcemap; returns False on failure."""
+    cache_path = mappings_cache_path(map_path)
+    header = {
+        'key': _cache_key(map_path),
+        'sources': mappings.sources,
+        'names': mappings.names,
+        'lengths': {column: len(getattr(mappings, column)) for column in _CACHE_COLUMNS},
+    }
+    
+    try:
+        # mkstemp creates the file exclusively (O_EXCL, mode 0600), so a
+        # symlink or file planted at a predictable name is never written through
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=os.path.basename(cache_path) + '.',
+            suffix='.tmp',
+            dir=os.path.dirname(cache_path) or '.',
+        )
+    except OSError:
+        return False
+    
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(CACHE_MAGIC)
+            f.write(json.dumps(header).encode('utf-8') + b'\n')
+            for column in _CACHE_COLUMNS:
+                getattr(mappings, column).tofile(f)
+        # Atomic so a concurrent run never sees a partially written cache
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
+    
+    return True
+
+
 def main():
-    if len(sys.argv) < 4:
-        print("Usage: python3 sourcemap_trace.py <path_to_js.map> <line> <column>")
+    args = [arg for arg in sys.argv[1:] if arg != '--no-context']
+    show_context = len(args) == len(sys.argv) - 1
+    
+    if len(args) < 3:
+        print("Usage: python3 sourcemap_trace.py [--no-context] <path_to_js.map> <line> <column>")
         print()
         print("Example:")
         print("  python3 ops/sourcemap_trace.py /tmp/main.abc123.js.map 2 1690087")
@@ -207,10 +823,10 @@ def main():
         print("    sh -lc 'cat /usr/share/nginx/html/static/js/main.<hash>.js.map' > /tmp/main.<hash>.js.map")
         sys.exit(1)
     
-    map_path = sys.argv[1]
+    map_path = args[0]
     try:
-        line = int(sys.argv[2])
-        column = int(sys.argv[3])
+        line = int(args[1])
+        column = int(args[2])
     except ValueError:
         print("Error: line and column must be integers")
         sys.exit(1)
@@ -229,39 +845,56 @@ def main():
     print(f"Loading sourcemap: {map_path}")
     print(f"File size: {os.path.getsize(map_path):,} bytes")
     
-    try:
-        with open(map_path, 'r', encoding='utf-8') as f:
-            sourcemap = json.load(f)
-    except json.JSONDecodeError as e:
-        print(f"Error: Invalid JSON in sourcemap file: {e}")
-        sys.exit(1)
+    # Reuse mappings parsed by an earlier run if the sourcemap is unchanged
+    mappings = load_mappings_cache(map_path)
     
-    # Extract sourcemap components
-    sources = sourcemap.get('sources', [])
-    names = sourcemap.get('names', [])
-    mappings_str = sourcemap.get('mappings', '')
+    if mappings is None:
+        # Extract sourcemap components
+        try:
+            sources, names, mappings_bytes = load_sourcemap_fields(map_path)
+        except ValueError as e:
+            print(f"Error: Invalid JSON in sourcemap file: {e}")
+            sys.exit(1)
+    else:
+        sources, names = mappings.sources, mappings.names
     
     print(f"Sources: {len(sources)} files")
     print(f"Names: {len(names)} identifiers")
-    print(f"Parsing mappings...")
     
-    # Parse mappings
-    mappings = parse_mappings(mappings_str, sources, names)
-    print(f"Total mappings: {len(mappings):,}")
+    if mappings is not None:
+        print(f"Using cached mappings: {mappings_cache_path(map_path)}")
+        print(f"Total mappings: {len(mappings):,}")
+    else:
+        try:
+            if not show_context:
+                # Only the lines find_mapping may look at for either line interpretation
+                first_line = line - 1 - ADJACENT_LINE_SEARCH
+                last_line = line + ADJACENT_LINE_SEARCH
+                print(f"Parsing mappings for generated lines {max(first_line, 0)} to {last_line}...")
+                
+                mappings = parse_mappings_line_range(mappings_bytes, sources, names, first_line, last_line)
+                print(f"Mappings in range: {len(mappings):,}")
+            else:
+                print(f"Parsing mappings...")
+                
+                # Parse mappings
+                mappings = parse_mappings_parallel(mappings_bytes, sources, names)
+                save_mappings_cache(mappings, map_path)
+                print(f"Total mappings: {len(mappings):,}")
+        except OverflowError:
+            # Columns are 32-bit arrays; valid sourcemap values always fit
+            print("Error: Sourcemap mappings are malformed (value out of 32-bit range)")
+            sys.exit(1)
     
     # Find the mapping for the given position
     # Note: sourcemaps use 0-indexed lines, but stack traces often use 1-indexed
     # Try both interpretations
     print(f"\nLooking up generated position: line {line}, column {column}")
     
-    # Try 0-indexed (line as-is, since sourcemaps are 0-indexed)
-    mapping = find_mapping(mappings, line - 1, column)  # Convert 1-indexed to 0-indexed
-    
-    if mapping is None:
-        # Try as 0-indexed directly
-        mapping = find_mapping(mappings, line, column)
+    index = find_trace_mapping(mappings, line, column)
     
-    if mapping:
+    if index is not None:
+        mapping = mappings.get(index)
         print("\n" + "=" * 60)
         print("ORIGINAL SOURCE LOCATION:")
         print("=" * 60)
@@ -273,22 +906,14 @@ def main():
         print("=" * 60)
         
         # Show context: nearby mappings from the same source file
-        if mapping.source_file:
-            same_file_mappings = [
-                m for m in mappings 
-                if m.source_file == mapping.source_file 
-                and m.original_line is not None
-                and abs((m.original_line or 0) - (mapping.original_line or 0)) <= 5
-            ]
-            if same_file_mappings:
+        if show_context and mapping.source_file:
+            nearby = find_nearby_mappings(mappings, index)
+            if nearby:
                 print("\nNearby mappings in same file:")
-                seen_lines = set()
-                for m in sorted(same_file_mappings, key=lambda x: x.original_line or 0):
-                    if m.original_line not in seen_lines:
-                        seen_lines.add(m.original_line)
-                        marker = " <-- TARGET" if m.original_line == mapping.original_line else ""
-                        name_str = f" ({m.name})" if m.name else ""
-                        print(f"  Line {(m.original_line or 0) + 1}{name_str}{marker}")
+                for m in map(mappings.get, nearby):
+                    marker = " <-- TARGET" if m.original_line == mapping.original_line else ""
+                    name_str = f" ({m.name})" if m.name else ""
+                    print(f"  Line {m.original_line + 1}{name_str}{marker}")
     else:
         print("\nNo mapping found for the specified position.")
         print("This could mean:")
@@ -298,9 +923,9 @@ def main():
         
         # Show some stats about what's in the sourcemap
         if mappings:
-            lines_with_mappings = set(m.generated_line for m in mappings)
+            lines_with_mappings = mappings.lines_with_mappings()
             print(f"\nSourcemap has mappings for {len(lines_with_mappings)} generated lines")
-            print(f"Generated lines range: {min(lines_with_mappings)} to {max(lines_with_mappings)}")
+            print(f"Generated lines range: {lines_with_mappings[0]} to {lines_with_mappings[-1]}")
 
 
 if __name__ == '__main__':